@@ -81,18 +81,29 @@ activities = {
 }
 
 
+def build_result(message: str, activity: dict,
+                 return_state: bool) -> dict[str, str | list[str]]:
+    """Build a mutation response, optionally with the updated participant list"""
+    result = {"message": message}
+    # Including the participants saves callers a follow-up GET
+    if return_state:
+        result["participants"] = activity["participants"]
+    return result
+
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
 
 
 @app.get("/activities")
-def get_activities():
+def get_activities() -> dict[str, dict]:
     return activities
 
 
 @app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
+def signup_for_activity(activity_name: str, email: str,
+                        return_state: bool = False) -> dict[str, str | list[str]]:
     """Sign up a student for an activity"""
     # Validate activity exists
     if activity_name not in activities:
@@ -108,11 +119,13 @@ def signup_for_activity(activity_name: str, email: str):
     
     # Add student
     activity["participants"].append(email)
-    return {"message": f"Signed up {email} for {activity_name}"}
+    return build_result(f"Signed up {email} for {activity_name}",
+                        activity, return_state)
 
 
 @app.delete("/activities/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str):
+def unregister_from_activity(activity_name: str, email: str,
+                             return_state: bool = False) -> dict[str, str | list[str]]:
     """Unregister a student from an activity"""
     # Validate activity exists
     if activity_name not in activities:
@@ -128,4 +141,5 @@ def unregister_from_activity(activity_name: str, email: str):
     
     # Remove student
     activity["participants"].remove(email)
-    return {"message": f"Unregistered {email} from {activity_name}"}
+    return build_result(f"Unregistered {email} from {activity_name}",
+                        activity, return_state)
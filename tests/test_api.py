@@ -2,12 +2,64 @@
 Tests for Mergington High School Activities API
 """
 
+import asyncio
+from urllib.parse import quote
+
+import httpx
+import orjson
 import pytest
+import pytest_asyncio
+from fastapi.responses import RedirectResponse
+from fastapi.routing import APIRoute
 from fastapi.testclient import TestClient
-from src.app import app
+from src.app import app, activities
+
+
+_EXPECTED_ACTIVITIES: frozenset[str] = frozenset({
+    "Chess Club", "Programming Class", "Gym Class",
+    "Soccer Team", "Basketball Club", "Art Club",
+    "Drama Society", "Math Club", "Science Olympiad"
+})
+
+# URL-encoded endpoint paths, built once per module
+_SIGNUP_URL: dict[str, str] = {
+    a: f"/activities/{quote(a)}/signup" for a in _EXPECTED_ACTIVITIES
+}
+_UNREGISTER_URL: dict[str, str] = {
+    a: f"/activities/{quote(a)}/unregister" for a in _EXPECTED_ACTIVITIES
+}
+
+_CONCURRENT_EMAILS: frozenset[str] = frozenset(
+    f"concurrent{i}@mergington.edu" for i in range(5)
+)
 
-# Create a test client
-client = TestClient(app)
+
+def jload(response):
+    """Decode a response body with orjson"""
+    return orjson.loads(response.content)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Shared test client, entered once for the whole test session"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="module")
+def activities_snapshot(client):
+    """Parsed /activities payload shared by read-only tests"""
+    response = client.get("/activities")
+    assert response.status_code == 200
+    return jload(response)
+
+
+@pytest_asyncio.fixture
+async def async_client():
+    """Async test client for issuing concurrent requests against the app"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
 
 
 class TestActivitiesAPI:
@@ -15,21 +67,29 @@ class TestActivitiesAPI:
 
     def test_root_redirect(self):
         """Test that root path redirects to static index.html"""
-        response = client.get("/", follow_redirects=False)
+        # Call the route's endpoint directly instead of going through HTTP
+        root_route = next((route for route in app.router.routes
+                           if isinstance(route, APIRoute) and route.path == "/"), None)
+        assert root_route is not None, "Root route is not registered"
+        response = root_route.endpoint()
+        assert isinstance(response, RedirectResponse)
         assert response.status_code == 307  # Temporary redirect
         assert response.headers["location"] == "/static/index.html"
 
-    def test_get_activities(self):
+    def test_root_redirect_smoke(self, client):
+        """Smoke test the root redirect through the full app stack"""
+        response = client.get("/", follow_redirects=False)
+        assert response.status_code == 307
+        assert response.headers["location"] == "/static/index.html"
+
+    def test_get_activities(self, activities_snapshot):
         """Test retrieving all activities"""
-        response = client.get("/activities")
-        assert response.status_code == 200
-        
-        activities = response.json()
-        assert isinstance(activities, dict)
-        assert len(activities) > 0
+        payload = activities_snapshot
+        assert isinstance(payload, dict)
+        assert len(payload) > 0
         
         # Check that each activity has required fields
-        for activity_name, activity_data in activities.items():
+        for activity_name, activity_data in payload.items():
             assert "description" in activity_data
             assert "schedule" in activity_data
             assert "max_participants" in activity_data
@@ -37,14 +97,13 @@ class TestActivitiesAPI:
             assert isinstance(activity_data["participants"], list)
             assert isinstance(activity_data["max_participants"], int)
 
-    def test_get_activities_structure(self):
+    def test_get_activities_structure(self, activities_snapshot):
         """Test that activities have the expected structure"""
-        response = client.get("/activities")
-        activities = response.json()
+        payload = activities_snapshot
         
         # Test a specific activity exists and has correct structure
-        assert "Chess Club" in activities
-        chess_club = activities["Chess Club"]
+        assert "Chess Club" in payload
+        chess_club = payload["Chess Club"]
         assert chess_club["description"] == "Learn strategies and compete in chess tournaments"
         assert chess_club["schedule"] == "Fridays, 3:30 PM - 5:00 PM"
         assert chess_club["max_participants"] == 12
@@ -54,58 +113,59 @@ class TestActivitiesAPI:
 class TestSignupEndpoint:
     """Test suite for activity signup functionality"""
 
-    def test_signup_success(self):
+    def test_signup_success(self, client):
         """Test successful signup for an activity"""
         response = client.post(
-            "/activities/Chess Club/signup?email=test@mergington.edu"
+            _SIGNUP_URL["Chess Club"], params={"email": "test@mergington.edu"}
         )
         assert response.status_code == 200
-        result = response.json()
+        result = jload(response)
         assert "message" in result
         assert "test@mergington.edu" in result["message"]
         assert "Chess Club" in result["message"]
+        assert "participants" not in result
 
-    def test_signup_nonexistent_activity(self):
+    def test_signup_nonexistent_activity(self, client):
         """Test signup for non-existent activity returns 404"""
         response = client.post(
-            "/activities/Nonexistent Activity/signup?email=test@mergington.edu"
+            "/activities/Nonexistent%20Activity/signup",
+            params={"email": "test@mergington.edu"}
         )
         assert response.status_code == 404
-        result = response.json()
+        result = jload(response)
         assert result["detail"] == "Activity not found"
 
-    def test_signup_duplicate_participant(self):
+    def test_signup_duplicate_participant(self, client):
         """Test that duplicate signup returns 400 error"""
         email = "duplicate@mergington.edu"
         activity = "Programming Class"
         
         # First signup should succeed
-        response1 = client.post(f"/activities/{activity}/signup?email={email}")
+        response1 = client.post(_SIGNUP_URL[activity], params={"email": email})
         assert response1.status_code == 200
         
         # Second signup should fail
-        response2 = client.post(f"/activities/{activity}/signup?email={email}")
+        response2 = client.post(_SIGNUP_URL[activity], params={"email": email})
         assert response2.status_code == 400
-        result = response2.json()
+        result = jload(response2)
         assert "already signed up" in result["detail"]
 
-    def test_signup_updates_participant_list(self):
+    def test_signup_updates_participant_list(self, client):
         """Test that signup actually adds participant to the list"""
         email = "newparticipant@mergington.edu"
         activity = "Art Club"
         
         # Get initial participant count
-        initial_response = client.get("/activities")
-        initial_participants = initial_response.json()[activity]["participants"]
-        initial_count = len(initial_participants)
+        initial_count = len(activities[activity]["participants"])
         
-        # Sign up new participant
-        signup_response = client.post(f"/activities/{activity}/signup?email={email}")
+        # Sign up new participant and get the updated list back
+        signup_response = client.post(
+            _SIGNUP_URL[activity], params={"email": email, "return_state": 1}
+        )
         assert signup_response.status_code == 200
         
         # Check participant was added
-        updated_response = client.get("/activities")
-        updated_participants = updated_response.json()[activity]["participants"]
+        updated_participants = jload(signup_response)["participants"]
         assert len(updated_participants) == initial_count + 1
         assert email in updated_participants
 
@@ -113,62 +173,66 @@ class TestSignupEndpoint:
 class TestUnregisterEndpoint:
     """Test suite for activity unregister functionality"""
 
-    def test_unregister_success(self):
+    def test_unregister_success(self, client):
         """Test successful unregistration from an activity"""
         email = "unregister@mergington.edu"
         activity = "Drama Society"
         
         # First sign up
-        client.post(f"/activities/{activity}/signup?email={email}")
+        client.post(_SIGNUP_URL[activity], params={"email": email})
         
         # Then unregister
-        response = client.delete(f"/activities/{activity}/unregister?email={email}")
+        response = client.delete(_UNREGISTER_URL[activity], params={"email": email})
         assert response.status_code == 200
-        result = response.json()
+        result = jload(response)
         assert "message" in result
         assert "Unregistered" in result["message"]
         assert email in result["message"]
         assert activity in result["message"]
+        assert "participants" not in result
 
-    def test_unregister_nonexistent_activity(self):
+    def test_unregister_nonexistent_activity(self, client):
         """Test unregister from non-existent activity returns 404"""
         response = client.delete(
-            "/activities/Nonexistent Activity/unregister?email=test@mergington.edu"
+            "/activities/Nonexistent%20Activity/unregister",
+            params={"email": "test@mergington.edu"}
         )
         assert response.status_code == 404
-        result = response.json()
+        result = jload(response)
         assert result["detail"] == "Activity not found"
 
-    def test_unregister_not_registered_participant(self):
+    def test_unregister_not_registered_participant(self, client):
         """Test unregister for non-registered participant returns 400"""
         response = client.delete(
-            "/activities/Math Club/unregister?email=notregistered@mergington.edu"
+            _UNREGISTER_URL["Math Club"], params={"email": "notregistered@mergington.edu"}
         )
         assert response.status_code == 400
-        result = response.json()
+        result = jload(response)
         assert "not registered" in result["detail"]
 
-    def test_unregister_removes_participant(self):
+    def test_unregister_removes_participant(self, client):
         """Test that unregister actually removes participant from the list"""
         email = "removeme@mergington.edu"
         activity = "Science Olympiad"
         
         # Sign up participant
-        client.post(f"/activities/{activity}/signup?email={email}")
+        response = client.post(
+            _SIGNUP_URL[activity], params={"email": email, "return_state": 1}
+        )
         
         # Verify participant is in the list
-        response = client.get("/activities")
-        participants = response.json()[activity]["participants"]
+        participants = jload(response)["participants"]
         assert email in participants
         initial_count = len(participants)
         
         # Unregister participant
-        unregister_response = client.delete(f"/activities/{activity}/unregister?email={email}")
+        unregister_response = client.delete(
+            _UNREGISTER_URL[activity], params={"email": email, "return_state": 1}
+        )
         assert unregister_response.status_code == 200
         
         # Verify participant is removed
-        updated_response = client.get("/activities")
-        updated_participants = updated_response.json()[activity]["participants"]
+        updated_participants = jload(unregister_response)["participants"]
         assert email not in updated_participants
         assert len(updated_participants) == initial_count - 1
 
@@ -176,99 +240,73 @@ class TestUnregisterEndpoint:
 class TestEdgeCases:
     """Test suite for edge cases and error conditions"""
 
-    def test_signup_with_special_characters_in_email(self):
-        """Test signup with special characters in email"""
-        email = "test+special@mergington.edu"
-        activity = "Basketball Club"
-        
-        response = client.post(f"/activities/{activity}/signup?email={email}")
-        assert response.status_code == 200
-
-    def test_signup_with_spaces_in_activity_name(self):
-        """Test signup with activity names containing spaces"""
-        email = "spaces@mergington.edu"
-        activity = "Soccer Team"  # Contains space
-        
-        response = client.post(f"/activities/{activity}/signup?email={email}")
-        assert response.status_code == 200
-
-    def test_activity_name_encoding(self):
-        """Test that activity names are properly URL encoded"""
-        # This tests the client's ability to handle URL encoding
-        email = "encoding@mergington.edu"
-        
-        # Use requests directly to test URL encoding
-        import urllib.parse
-        encoded_activity = urllib.parse.quote("Soccer Team")
-        
-        response = client.post(f"/activities/{encoded_activity}/signup?email={email}")
+    @pytest.mark.parametrize("email,activity,path", [
+        # Special characters in email
+        ("test+special@mergington.edu", "Basketball Club", _SIGNUP_URL["Basketball Club"]),
+        # Raw space in the path, left for the client to encode
+        ("spaces@mergington.edu", "Soccer Team", "/activities/Soccer Team/signup"),
+        # Percent-encoded activity path
+        ("encoding@mergington.edu", "Soccer Team", _SIGNUP_URL["Soccer Team"]),
+    ], ids=["special-characters", "spaces", "encoding"])
+    def test_signup_variants(self, client, email, activity, path):
+        """Test signup with unusual emails and activity names"""
+        response = client.post(path, params={"email": email})
         assert response.status_code == 200
+        assert email in activities[activity]["participants"]
 
 
 class TestDataIntegrity:
     """Test suite for data integrity and consistency"""
 
-    def test_max_participants_not_exceeded(self):
+    def test_max_participants_not_exceeded(self, activities_snapshot):
         """Test that activities maintain their max participant limits"""
-        response = client.get("/activities")
-        activities = response.json()
+        payload = activities_snapshot
         
-        for activity_name, activity_data in activities.items():
+        for activity_name, activity_data in payload.items():
             participants_count = len(activity_data["participants"])
             max_participants = activity_data["max_participants"]
             assert participants_count <= max_participants, f"{activity_name} has too many participants"
 
-    def test_participants_are_unique(self):
+    def test_participants_are_unique(self, activities_snapshot):
         """Test that each activity has unique participants"""
-        response = client.get("/activities")
-        activities = response.json()
+        payload = activities_snapshot
         
-        for activity_name, activity_data in activities.items():
+        for activity_name, activity_data in payload.items():
             participants = activity_data["participants"]
             unique_participants = set(participants)
             assert len(participants) == len(unique_participants), f"{activity_name} has duplicate participants"
 
-    def test_all_required_activities_exist(self):
+    def test_all_required_activities_exist(self, activities_snapshot):
         """Test that all expected activities are present"""
-        response = client.get("/activities")
-        activities = response.json()
+        payload = activities_snapshot
         
-        expected_activities = [
-            "Chess Club", "Programming Class", "Gym Class",
-            "Soccer Team", "Basketball Club", "Art Club",
-            "Drama Society", "Math Club", "Science Olympiad"
-        ]
-        
-        for expected_activity in expected_activities:
-            assert expected_activity in activities, f"Missing activity: {expected_activity}"
+        missing = _EXPECTED_ACTIVITIES - payload.keys()
+        assert not missing, f"Missing activities: {sorted(missing)}"
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_concurrent_signups_are_all_recorded(self, async_client):
+        """Test that concurrent signups for one activity are all recorded"""
+        activity = "Gym Class"
+        responses = await asyncio.gather(*[
+            async_client.post(_SIGNUP_URL[activity], params={"email": email})
+            for email in _CONCURRENT_EMAILS
+        ])
+        assert all(response.status_code == 200 for response in responses)
+
+        response = await async_client.get("/activities")
+        participants = jload(response)[activity]["participants"]
+        missing = _CONCURRENT_EMAILS.difference(participants)
+        assert not missing, f"Missing participants: {sorted(missing)}"
+        assert len(participants) == len(set(participants))
 
 
 @pytest.fixture(autouse=True)
 def reset_test_data():
     """Reset test data after each test to ensure test isolation"""
-    # This fixture runs before and after each test
+    # Only participant lists change, so snapshot just those
+    saved = {name: data["participants"][:] for name, data in activities.items()}
     yield
-    # Cleanup: Remove any test participants that were added
-    test_emails = [
-        "test@mergington.edu",
-        "duplicate@mergington.edu", 
-        "newparticipant@mergington.edu",
-        "unregister@mergington.edu",
-        "removeme@mergington.edu",
-        "test+special@mergington.edu",
-        "spaces@mergington.edu",
-        "encoding@mergington.edu"
-    ]
-    
-    # Get current activities
-    response = client.get("/activities")
-    if response.status_code == 200:
-        activities = response.json()
-        
-        # Remove test emails from all activities
-        for activity_name, activity_data in activities.items():
-            participants = activity_data["participants"]
-            for email in test_emails:
-                if email in participants:
-                    # Remove the test participant
-                    client.delete(f"/activities/{activity_name}/unregister?email={email}")
\ No newline at end of file
+    # Restore each list in place so the app keeps referencing the same objects
+    for activity_name, participants in saved.items():
+        activities[activity_name]["participants"][:] = participants